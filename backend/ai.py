@@ -1,24 +1,39 @@
 """
 AI Module - Google Gemini meeting summarization.
-Uses inline bytes for audio (no Files API polling needed).
+Small audio files are sent as inline bytes; large ones go through the Files API.
 """
 
 import os
+import re
 import json
 import time
+import asyncio
+import shutil
+import hashlib
 import logging
-from typing import Optional, Dict, Any
+import subprocess
+import tempfile
+import functools
+from typing import Optional, Dict, Any, List, Tuple
+import httpx
+import orjson
+from pydantic import ValidationError
 from dotenv import load_dotenv
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 
-# Load environment variables
-backend_dir = os.path.dirname(os.path.abspath(__file__))
-env_path = os.path.join(backend_dir, '.env')
-load_dotenv(dotenv_path=env_path, override=True)
+from schemas import MeetingSummary
+
+# Load environment variables (skipped when main.py or the container already set them)
+if not os.getenv("GEMINI_API_KEY"):
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    env_path = os.path.join(backend_dir, '.env')
+    load_dotenv(dotenv_path=env_path, override=True)
 
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 API_KEY = os.getenv("GEMINI_API_KEY")
@@ -26,30 +41,92 @@ client = None
 
 if API_KEY:
     try:
-        client = genai.Client(api_key=API_KEY)
-        logger.info(f"Gemini client initialized with key: {API_KEY[:10]}...")
+        # One pooled HTTP/2 connection is shared by retries and concurrent meetings,
+        # so each call doesn't pay a fresh TLS handshake
+        client = genai.Client(
+            api_key=API_KEY,
+            http_options=types.HttpOptions(
+                client_args={
+                    "http2": True,
+                    "limits": httpx.Limits(max_keepalive_connections=32, keepalive_expiry=300),
+                }
+            )
+        )
+        logger.info("Gemini client initialized with key: %s...", API_KEY[:10])
     except Exception as e:
-        logger.error(f"Failed to initialize Gemini client: {e}")
+        logger.error("Failed to initialize Gemini client: %s", e)
 else:
     logger.error("GEMINI_API_KEY not found in environment")
 
+MODEL_NAME = "gemini-3-flash-preview"
+
 MAX_RETRIES = 3
-RETRY_DELAY = 3
-
-SUMMARY_PROMPT = """
-Analyze this meeting and provide a comprehensive structured summary.
-
-Return ONLY valid JSON in this exact structure:
-{
-    "summary": "Brief 2-3 sentence overview of the meeting",
-    "key_points": ["Point 1", "Point 2", "Point 3"],
-    "decisions": ["Decision 1", "Decision 2"],
-    "action_items": [
-        {"task": "Task description", "owner": "Person Name", "status": "Pending"}
-    ],
-    "agenda": ["Topic 1", "Topic 2", "Topic 3"]
+RETRY_MIN_DELAY = 0.5
+RETRY_MAX_DELAY = 8
+
+# Audio at or above this size is uploaded via the Files API instead of sent inline
+INLINE_MAX_MB = 15
+UPLOAD_POLL_DELAY = 1
+UPLOAD_POLL_MAX_DELAY = 16
+UPLOAD_TIMEOUT = 600
+
+# Files API handles keyed by (sha1(file_path), mtime) so retries reuse the upload
+_uploaded_files: Dict[tuple, str] = {}
+
+# Audio is transcoded to 16kHz mono Opus before sending; Gemini downsamples speech
+# internally, so this only cuts upload size. Transcodes are cached per file version
+# and pruned after TRANSCODE_CACHE_TTL.
+TRANSCODE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "meetingbot_tx_cache")
+TRANSCODE_CACHE_TTL = 24 * 3600
+TRANSCODE_BITRATE = "24k"
+TRANSCODE_SKIP_MAX_BITRATE = 32000
+# A hung ffmpeg/ffprobe would otherwise block its worker thread (and the meeting) forever
+TRANSCODE_TIMEOUT = 300
+PROBE_TIMEOUT = 30
+
+# Successful summaries are cached on disk by content hash, so re-running an identical
+# recording or transcript skips the model call entirely
+SUMMARY_CACHE_DIR = os.getenv(
+    "MEETINGBOT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "meetingbot_summary_cache")
+)
+SUMMARY_CACHE_TTL = 24 * 3600
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Batch jobs usually finish within minutes but may take up to 24h
+BATCH_POLL_DELAY = 30
+BATCH_DONE_STATES = {
+    types.JobState.JOB_STATE_SUCCEEDED,
+    types.JobState.JOB_STATE_FAILED,
+    types.JobState.JOB_STATE_CANCELLED,
+    types.JobState.JOB_STATE_EXPIRED,
 }
-"""
+
+# The JSON shape comes from response_schema, so the prompt only states the task
+SUMMARY_PROMPT = "Summarize this meeting: overview, key points, decisions, action items with owners, and agenda topics."
+
+# Built once so every request reuses the same prompt part instead of re-concatenating it
+SUMMARY_PROMPT_PART = types.Part.from_text(text=SUMMARY_PROMPT)
+TRANSCRIPT_HEADER_PART = types.Part.from_text(text="Meeting Transcript:")
+
+# Transcript cleanup: filler words and repeated spaces are billed as input tokens
+_FILLER_RE = re.compile(r'\b(?:u+m+|u+h+|e+r+|hmm+)\b,?', re.IGNORECASE)
+_SPACES_RE = re.compile(r'[ \t]{2,}')
+# A "Name:" prefix marks a speaker turn, except for common note labels. Any other
+# capitalised word followed by a colon is still read as a speaker name.
+_SPEAKER_RE = re.compile(r'^([A-Z][a-z]+):\s*')
+_NOTE_LABELS = frozenset({
+    "Note", "Notes", "Decision", "Decisions", "Action", "Actions", "Todo", "Agenda",
+    "Summary", "Question", "Answer", "Update", "Topic", "Next", "Followup", "Reminder",
+})
+
+# Generation config is validated once here and reused by every request
+_GEN_CFG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema=MeetingSummary
+)
+
+# Batch requests are raw JSON, so they carry the schema in JSON Schema form
+SUMMARY_JSON_SCHEMA = MeetingSummary.model_json_schema()
 
 # Map file extensions to MIME types
 MIME_TYPES = {
@@ -61,109 +138,451 @@ MIME_TYPES = {
     '.m4a': 'audio/mp4',
     '.flac': 'audio/flac',
 }
+_MIME_ITEMS = tuple(MIME_TYPES.items())
 
 
 def generate_meeting_summary(transcript: Optional[str] = None, file_path: Optional[str] = None) -> Dict[str, Any]:
     """
-    Generate structured meeting summary using Gemini.
-    Audio files are sent as inline bytes (no Files API).
+    Generate structured meeting summary using Gemini; raises if no summary could be produced.
+    Audio under INLINE_MAX_MB is sent as inline bytes, larger files via the Files API.
     """
-    logger.info(f"[AI] generate_meeting_summary called | transcript={transcript is not None} | file={file_path}")
+    logger.info("[AI] generate_meeting_summary called | transcript=%s | file=%s", transcript is not None, file_path)
 
     if not client:
-        return _get_mock_data(error="Gemini client not initialized. Check API key.")
+        raise RuntimeError("Gemini client not initialized. Check API key.")
 
-    for attempt in range(MAX_RETRIES):
+    # One stat both checks existence and gives size/mtime to the audio path
+    st = None
+    if file_path:
         try:
-            if file_path and os.path.exists(file_path):
-                return _process_audio_file(file_path)
-            elif transcript:
-                return _process_transcript(transcript)
-            else:
-                return _get_mock_data(error="No content provided for analysis.")
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            logger.error("[AI] Audio file not found: %s", file_path)
+
+    if st is not None:
+        digest = _content_digest(file_path=file_path)
+    elif transcript:
+        digest = _content_digest(transcript=transcript)
+    else:
+        raise ValueError("No content provided for analysis.")
+
+    cached = _read_cached_summary(digest)
+    if cached is not None:
+        logger.info("[AI] Summary cache hit: %s", digest)
+        return cached
+
+    if st is not None:
+        result = _process_audio_file(file_path, st)
+    else:
+        result = _process_transcript(_compact_transcript(transcript))
+
+    # Failures raise above, so only real summaries reach the cache
+    _write_cached_summary(digest, result)
+    return result
+
+
+def _content_digest(file_path: Optional[str] = None, transcript: Optional[str] = None) -> str:
+    """blake2b of the audio bytes (streamed) or transcript text, salted with model and prompt."""
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f"{MODEL_NAME}\n{SUMMARY_PROMPT}\n".encode())
+    if file_path:
+        with open(file_path, 'rb') as f:
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                hasher.update(chunk)
+    else:
+        hasher.update(transcript.encode())
+    return hasher.hexdigest()
+
+
+def _read_cached_summary(digest: str) -> Optional[Dict[str, Any]]:
+    """Return the cached summary for digest if present and younger than SUMMARY_CACHE_TTL."""
+    cache_path = os.path.join(SUMMARY_CACHE_DIR, f"{digest}.json")
+    try:
+        if time.time() - os.stat(cache_path).st_mtime > SUMMARY_CACHE_TTL:
+            return None
+        with open(cache_path, 'rb') as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def _write_cached_summary(digest: str, result: Dict[str, Any]) -> None:
+    """Write the summary atomically (temp file + os.replace) and prune expired entries; failures only skip caching."""
+    cache_path = os.path.join(SUMMARY_CACHE_DIR, f"{digest}.json")
+    try:
+        data = orjson.dumps(result)
+        os.makedirs(SUMMARY_CACHE_DIR, exist_ok=True)
+        # Unique temp name per call: concurrent summaries share one pid (worker threads)
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{digest}.", suffix=".tmp", dir=SUMMARY_CACHE_DIR)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError) as e:
+        logger.error("[AI] Could not write summary cache %s: %s", cache_path, e)
+
+    _prune_cache_dir(SUMMARY_CACHE_DIR, SUMMARY_CACHE_TTL)
+
+
+def _prune_cache_dir(cache_dir: str, ttl: float) -> None:
+    """Delete files in cache_dir not modified within ttl seconds (e.g. entries for deleted meetings)."""
+    cutoff = time.time() - ttl
+    try:
+        entries = os.scandir(cache_dir)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                # Already removed by a concurrent prune, or not ours to delete
+                pass
+
+
+def _log_retry(retry_state) -> None:
+    """Log a failed attempt before tenacity backs off."""
+    logger.error(
+        "[AI] Error (attempt %d/%d): %s",
+        retry_state.attempt_number, MAX_RETRIES, retry_state.outcome.exception()
+    )
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Only transient failures are worth retrying: 5xx, rate limits/timeouts and network errors."""
+    if isinstance(exc, errors.ServerError):
+        return True
+    if isinstance(exc, errors.ClientError):
+        return exc.code in (408, 429)
+    return isinstance(exc, httpx.TransportError)
+
+
+# Exponential backoff with jitter (0.5s, 1s, 2s... capped) so concurrent callers
+# don't retry in lockstep; auth and bad-request errors fail immediately
+_with_retries = retry(
+    retry=retry_if_exception(_is_retryable),
+    wait=wait_exponential_jitter(initial=RETRY_MIN_DELAY, max=RETRY_MAX_DELAY),
+    stop=stop_after_attempt(MAX_RETRIES),
+    before_sleep=_log_retry,
+    reraise=True,
+)
+
+
+async def generate_meeting_summaries_batch(
+    items: List[Tuple[Optional[str], Optional[str]]]
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Generate summaries for many meetings in a single Gemini Batch API job.
+    Each item is a (transcript, file_path) pair; results are returned in the same order,
+    with None (and the error logged) for items that could not be summarized.
+    Batch requests are billed at half the interactive rate, so use this for bulk reprocessing.
+    """
+    logger.info("[AI] generate_meeting_summaries_batch called | items=%d", len(items))
+
+    if not client:
+        logger.error("[AI] Gemini client not initialized. Check API key.")
+        return [None] * len(items)
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    lines = []
+
+    for i, (transcript, file_path) in enumerate(items):
+        st = None
+        if file_path:
+            try:
+                st = os.stat(file_path)
+            except FileNotFoundError:
+                logger.error("[AI] Audio file not found: %s", file_path)
+
+        if st is not None:
+            try:
+                upload_path, mime_type, upload_st = await asyncio.to_thread(_transcode_for_upload, file_path, st)
+                uploaded = await asyncio.to_thread(_get_uploaded_file, upload_path, mime_type, upload_st)
+            except Exception as e:
+                logger.error("[AI] Batch upload failed for %s: %s", file_path, e)
+                continue
+            parts = [
+                {"text": SUMMARY_PROMPT},
+                {"file_data": {"file_uri": uploaded.uri, "mime_type": uploaded.mime_type}},
+            ]
+        elif transcript:
+            parts = [{"text": SUMMARY_PROMPT}, {"text": "Meeting Transcript:"}, {"text": _compact_transcript(transcript)}]
+        else:
+            logger.error("[AI] No content provided for batch item %d", i)
+            continue
+
+        lines.append(json.dumps({
+            "key": f"mtg_{i}",
+            "request": {
+                "contents": [{"role": "user", "parts": parts}],
+                "generation_config": {
+                    "response_mime_type": "application/json",
+                    "response_json_schema": SUMMARY_JSON_SCHEMA,
+                },
+            },
+        }))
+
+    if lines:
+        try:
+            await _run_batch(lines, results)
         except Exception as e:
-            logger.error(f"[AI] Error (attempt {attempt + 1}/{MAX_RETRIES}): {e}")
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(RETRY_DELAY)
-            else:
-                return _get_mock_data(error=str(e))
-
-    return _get_mock_data(error="Unknown error")
-
-
-def _process_audio_file(file_path: str) -> Dict[str, Any]:
-    """Read audio file as bytes and send inline to Gemini."""
-    file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
-    ext = os.path.splitext(file_path)[1].lower()
-    mime_type = MIME_TYPES.get(ext, 'audio/webm')
-
-    logger.info(f"[AI] Processing audio: {file_path} ({file_size_mb:.1f}MB, {mime_type})")
-
-    # Read the file as bytes
-    with open(file_path, 'rb') as f:
-        audio_bytes = f.read()
-
-    logger.info(f"[AI] Read {len(audio_bytes)} bytes, sending inline to Gemini...")
-
-    # Send as inline bytes — no file upload, no polling
-    response = client.models.generate_content(
-        model="gemini-3-flash-preview",
-        contents=[
-            SUMMARY_PROMPT,
-            types.Part.from_bytes(data=audio_bytes, mime_type=mime_type)
-        ],
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json"
+            logger.error("[AI] Batch job error: %s", e)
+
+    return results
+
+
+async def _run_batch(lines: List[str], results: List[Optional[Dict[str, Any]]]) -> None:
+    """Upload the JSONL requests, run the batch job and fill results by request key (failed requests stay None)."""
+    with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False, encoding='utf-8') as f:
+        f.write("\n".join(lines))
+        jsonl_path = f.name
+
+    try:
+        uploaded = await client.aio.files.upload(
+            file=jsonl_path,
+            config=types.UploadFileConfig(mime_type='jsonl', display_name='meeting-summaries')
         )
+    finally:
+        os.remove(jsonl_path)
+
+    batch_job = await client.aio.batches.create(
+        model=MODEL_NAME,
+        src={"file_name": uploaded.name},
+        config={"display_name": "meeting-summaries"}
     )
+    logger.info("[AI] Batch job created: %s (%d requests)", batch_job.name, len(lines))
+
+    while batch_job.state not in BATCH_DONE_STATES:
+        await asyncio.sleep(BATCH_POLL_DELAY)
+        batch_job = await client.aio.batches.get(name=batch_job.name)
+
+    if batch_job.state != types.JobState.JOB_STATE_SUCCEEDED:
+        raise RuntimeError(f"Batch job {batch_job.name} ended with state {batch_job.state}")
+
+    logger.info("[AI] Batch job succeeded: %s", batch_job.name)
+    content = await client.aio.files.download(file=batch_job.dest.file_name)
+
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        entry = orjson.loads(line)
+        index = int(entry["key"].removeprefix("mtg_"))
+        if "response" in entry:
+            try:
+                response = types.GenerateContentResponse.model_validate(entry["response"])
+                results[index] = _parse_response_bytes((response.text or '').encode())
+            except ValueError as e:
+                logger.error("[AI] Batch request %s unusable: %s", entry["key"], e)
+        else:
+            logger.error("[AI] Batch request %s failed: %s", entry["key"], entry.get("error", "Unknown batch error"))
+
+
+@_with_retries
+def _process_audio_file(file_path: str, st: os.stat_result) -> Dict[str, Any]:
+    """Send audio to Gemini, inline for small files and via the Files API for large ones."""
+    file_path, mime_type, st = _transcode_for_upload(file_path, st)
+    file_size = st.st_size
+    file_size_mb = file_size / (1024 * 1024)
+
+    logger.info("[AI] Processing audio: %s (%.1fMB, %s)", file_path, file_size_mb, mime_type)
+
+    if file_size_mb >= INLINE_MAX_MB:
+        audio_part = _get_uploaded_file(file_path, mime_type, st)
+        logger.info("[AI] Using uploaded file %s, sending to Gemini...", audio_part.name)
+    else:
+        # Read the file as bytes
+        with open(file_path, 'rb') as f:
+            audio_bytes = f.read()
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[AI] Read %d bytes, sending inline to Gemini...", len(audio_bytes))
+        audio_part = types.Part.from_bytes(data=audio_bytes, mime_type=mime_type)
+
+    return _generate([SUMMARY_PROMPT_PART, audio_part])
+
+
+def _generate(contents: List[types.Part]) -> Dict[str, Any]:
+    """Stream the response into a buffer so receiving overlaps generation, then parse once."""
+    buf = bytearray()
+    for chunk in client.models.generate_content_stream(model=MODEL_NAME, contents=contents, config=_GEN_CFG):
+        if chunk.text:
+            buf.extend(chunk.text.encode())
 
     logger.info("[AI] Content generation successful")
-    return _parse_response(response)
+    return _parse_response_bytes(bytes(buf))
+
+
+@functools.lru_cache(maxsize=1024)
+def _mime_for(path: str) -> str:
+    """Resolve the audio MIME type from the file extension (cached per path)."""
+    low = path.lower()
+    return next((mime for ext, mime in _MIME_ITEMS if low.endswith(ext)), 'audio/webm')
+
+
+def _transcode_for_upload(file_path: str, st: os.stat_result) -> Tuple[str, str, os.stat_result]:
+    """
+    Return (path, mime_type, stat) of a 16kHz mono Opus copy of the audio.
+    Falls back to the original file when ffmpeg is missing, the transcode fails,
+    or the input is already low-bitrate Opus.
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return file_path, _mime_for(file_path), st
+
+    key = _transcode_key(file_path, st)
+    out_path = os.path.join(TRANSCODE_CACHE_DIR, f"{key}.ogg")
+    try:
+        return out_path, 'audio/ogg', os.stat(out_path)
+    except FileNotFoundError:
+        pass
+
+    if _is_compact_opus(file_path):
+        return file_path, _mime_for(file_path), st
+
+    os.makedirs(TRANSCODE_CACHE_DIR, exist_ok=True)
+    # Unique temp name per call so concurrent transcodes of the same file don't collide
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{key}.", suffix=".part.ogg", dir=TRANSCODE_CACHE_DIR)
+    os.close(fd)
+    try:
+        # -vn/-sn/-dn: only the audio stream goes in, so video recordings (.mp4) stay audio-only
+        result = subprocess.run(
+            [ffmpeg, "-y", "-loglevel", "error", "-i", file_path, "-vn", "-sn", "-dn",
+             "-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", TRANSCODE_BITRATE, tmp_path],
+            capture_output=True, timeout=TRANSCODE_TIMEOUT
+        )
+        error = result.stderr[:500].decode(errors='replace') if result.returncode != 0 else None
+    except subprocess.TimeoutExpired:
+        error = f"timed out after {TRANSCODE_TIMEOUT}s"
+    if error:
+        logger.error("[AI] ffmpeg transcode failed, sending original: %s", error)
+        os.remove(tmp_path)
+        return file_path, _mime_for(file_path), st
+
+    os.replace(tmp_path, out_path)
+    out_st = os.stat(out_path)
+    logger.info("[AI] Transcoded %s -> %s (%d bytes)", file_path, out_path, out_st.st_size)
+    _prune_cache_dir(TRANSCODE_CACHE_DIR, TRANSCODE_CACHE_TTL)
+    return out_path, 'audio/ogg', out_st
+
 
+def _transcode_key(file_path: str, st: os.stat_result) -> str:
+    """Cache key for one version of an audio file: sha1 of its path plus its mtime."""
+    return f"{hashlib.sha1(file_path.encode()).hexdigest()}_{st.st_mtime_ns}"
 
+
+def discard_transcode(file_path: str) -> None:
+    """Remove the cached transcode of file_path; call before deleting the file, as the key needs its mtime."""
+    try:
+        st = os.stat(file_path)
+        os.remove(os.path.join(TRANSCODE_CACHE_DIR, f"{_transcode_key(file_path, st)}.ogg"))
+    except FileNotFoundError:
+        pass
+
+
+def _is_compact_opus(file_path: str) -> bool:
+    """Probe the first audio stream with ffprobe; True if it is Opus at or below TRANSCODE_SKIP_MAX_BITRATE."""
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        return False
+
+    try:
+        result = subprocess.run(
+            [ffprobe, "-v", "error", "-select_streams", "a:0",
+             "-show_entries", "stream=codec_name,bit_rate:format=bit_rate", "-of", "json", file_path],
+            capture_output=True, timeout=PROBE_TIMEOUT
+        )
+    except subprocess.TimeoutExpired:
+        return False
+    if result.returncode != 0:
+        return False
+
+    probe = orjson.loads(result.stdout)
+    streams = probe.get("streams") or [{}]
+    # WebM often has no per-stream bitrate, so fall back to the container's
+    bit_rate = streams[0].get("bit_rate") or probe.get("format", {}).get("bit_rate") or 0
+    return streams[0].get("codec_name") == "opus" and 0 < int(bit_rate) <= TRANSCODE_SKIP_MAX_BITRATE
+
+
+def _get_uploaded_file(file_path: str, mime_type: str, st: os.stat_result) -> types.File:
+    """Upload audio via the Files API (once per file version) and wait until it is ACTIVE."""
+    key = (hashlib.sha1(file_path.encode()).hexdigest(), st.st_mtime)
+    uploaded = None
+
+    name = _uploaded_files.get(key)
+    if name:
+        try:
+            uploaded = client.files.get(name=name)
+        except Exception as e:
+            # Uploaded files expire after 48h; fall through to a fresh upload
+            logger.info("[AI] Cached upload %s unavailable, re-uploading: %s", name, e)
+            _uploaded_files.pop(key, None)
+
+    if uploaded is None:
+        logger.info("[AI] Uploading %s via Files API...", file_path)
+        uploaded = client.files.upload(
+            file=file_path,
+            config=types.UploadFileConfig(mime_type=mime_type)
+        )
+        _uploaded_files[key] = uploaded.name
+
+    delay = UPLOAD_POLL_DELAY
+    deadline = time.monotonic() + UPLOAD_TIMEOUT
+    while uploaded.state != types.FileState.ACTIVE:
+        if uploaded.state == types.FileState.FAILED:
+            _uploaded_files.pop(key, None)
+            raise RuntimeError(f"Gemini failed to process uploaded file {uploaded.name}")
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Uploaded file {uploaded.name} not ACTIVE after {UPLOAD_TIMEOUT}s")
+        time.sleep(delay)
+        delay = min(delay * 2, UPLOAD_POLL_MAX_DELAY)
+        uploaded = client.files.get(name=uploaded.name)
+
+    return uploaded
+
+
+@_with_retries
 def _process_transcript(transcript: str) -> Dict[str, Any]:
     """Send transcript text to Gemini."""
     logger.info("[AI] Processing transcript...")
 
-    response = client.models.generate_content(
-        model="gemini-3-flash-preview",
-        contents=[f"{SUMMARY_PROMPT}\n\nMeeting Transcript:\n{transcript}"],
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json"
-        )
-    )
+    return _generate([SUMMARY_PROMPT_PART, TRANSCRIPT_HEADER_PART, types.Part.from_text(text=transcript)])
 
-    logger.info("[AI] Content generation successful")
-    return _parse_response(response)
 
+def _compact_transcript(transcript: str) -> str:
+    """Strip filler words and extra spaces, and merge consecutive turns by the same speaker."""
+    text = _SPACES_RE.sub(' ', _FILLER_RE.sub('', transcript))
+
+    lines = []
+    last_speaker = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = _SPEAKER_RE.match(line)
+        speaker = match.group(1) if match and match.group(1) not in _NOTE_LABELS else None
+        if speaker is not None and speaker == last_speaker:
+            lines[-1] += ' ' + line[match.end():]
+            continue
+        # Untagged lines end the current turn, so a later tag never joins onto them
+        last_speaker = speaker
+        lines.append(line)
+
+    return '\n'.join(lines)
 
-def _parse_response(response) -> Dict[str, Any]:
-    """Parse JSON from Gemini response."""
+
+def _parse_response_bytes(raw: bytes) -> Dict[str, Any]:
+    """Parse a raw (streamed or batch) Gemini response body and validate it against MeetingSummary."""
     try:
-        result = json.loads(response.text)
+        # orjson is several times faster than the stdlib json module
+        result = orjson.loads(raw)
         if isinstance(result, list) and len(result) > 0:
             result = result[0]
+        # response_schema is a hint to the model, not a guarantee; check before caching
+        result = MeetingSummary.model_validate(result).model_dump()
         logger.info("[AI] Successfully parsed response")
         return result
-    except json.JSONDecodeError as e:
-        logger.error(f"[AI] JSON parse error: {e}")
-        logger.error(f"[AI] Raw response: {response.text[:500]}")
-        return _get_mock_data(error=f"Failed to parse AI response: {e}")
-
+    except (orjson.JSONDecodeError, ValidationError) as e:
+        logger.error("[AI] JSON parse error: %s", e)
+        logger.error("[AI] Raw response: %s", raw[:500].decode(errors='replace'))
+        raise ValueError(f"Failed to parse AI response: {e}") from e
 
-def _get_mock_data(error=None):
-    """Fallback data when AI processing fails."""
-    summary = "AI generation failed."
-    if error:
-        summary += f" Error: {error}"
-
-    return {
-        "summary": summary,
-        "key_points": ["Unable to process meeting content", "Check API configuration", "Ensure audio file is valid"],
-        "decisions": ["Review API key and try again"],
-        "action_items": [
-            {"task": "Check Gemini API Key", "owner": "Developer", "status": "Pending"},
-            {"task": "Verify audio format", "owner": "Developer", "status": "Pending"}
-        ],
-        "agenda": ["API Configuration", "File Format"]
-    }
\ No newline at end of file
@@ -10,19 +10,83 @@ backend_dir = os.path.dirname(os.path.abspath(__file__))
 env_path = os.path.join(backend_dir, '.env')
 load_dotenv(dotenv_path=env_path, override=True)
 
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Body, BackgroundTasks
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, update, delete, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import asynccontextmanager
 from typing import List, Optional
-import shutil
 import json
+import asyncio
+import aiofiles
 from datetime import datetime
 import models, schemas, database
 
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
-models.Base.metadata.create_all(bind=database.engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with database.engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+        # create_all skips existing tables, so add any indexes an older meetings.db lacks
+        await conn.run_sync(create_missing_indexes)
+        # Summaries run as in-process background tasks, so any still 'processing' at
+        # startup were interrupted by a restart and will never finish
+        await conn.execute(
+            update(models.Meeting)
+            .where(models.Meeting.status == models.MeetingStatus.PROCESSING)
+            .values(status=models.MeetingStatus.ERROR)
+        )
+    yield
+    await database.engine.dispose()
 
-app = FastAPI()
+def create_missing_indexes(conn):
+    for index in models.Meeting.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
+app = FastAPI(lifespan=lifespan)
+
+class UploadSizeLimitMiddleware:
+    """
+    Pure ASGI middleware capping /meeting/create bodies at MAX_UPLOAD_BYTES.
+    Starlette spools the whole multipart body before the endpoint runs, so the limit is
+    enforced here: from Content-Length up front, and by counting body bytes as they are
+    received so chunked uploads are cut off as soon as they pass the cap.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != "/meeting/create":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+            print(f"[BACKEND] Upload exceeds {MAX_UPLOAD_BYTES} bytes, rejected")
+            response = JSONResponse(status_code=413, content={"detail": "Uploaded file is too large"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > MAX_UPLOAD_BYTES:
+                    print(f"[BACKEND] Upload exceeds {MAX_UPLOAD_BYTES} bytes, rejected")
+                    # Propagates out of form parsing and is rendered by FastAPI's exception handler
+                    raise HTTPException(status_code=413, detail="Uploaded file is too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+# Added before CORSMiddleware so it runs inside it and 413s still carry CORS headers
+app.add_middleware(UploadSizeLimitMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -32,25 +96,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON responses (e.g. /meetings with every ai_output); small ones go out as-is
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Dependency
-def get_db():
-    db = database.SessionLocal()
-    try:
+async def get_db():
+    async with database.SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # Directory for uploaded files
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Uploads are streamed to disk in fixed-size chunks so memory stays flat for long recordings
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Per-request size cap, enforced by UploadSizeLimitMiddleware while the body streams in
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "1024")) * 1024 * 1024
+
 @app.post("/meeting/create", response_model=schemas.Meeting)
 async def create_meeting(
+    background_tasks: BackgroundTasks,
     title: str = Form(...),
     type: str = Form(...),
     transcript: Optional[str] = Form(None),
     file: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     print(f"\n[BACKEND] Received create_meeting request")
     print(f"[BACKEND] Title: {title}")
@@ -62,13 +132,11 @@ async def create_meeting(
     if file:
         file_path = os.path.join(UPLOAD_DIR, file.filename)
         print(f"[BACKEND] Saving file to: {file_path}")
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await buffer.write(chunk)
         print(f"[BACKEND] File saved successfully")
 
-    # Generate AI Output
-    from ai import generate_meeting_summary
-    
     # Check if we have content to process
     if not transcript and not file_path:
         print("[BACKEND] No content provided, using fallback")
@@ -79,22 +147,11 @@ async def create_meeting(
             "action_items": [],
             "agenda": []
         }
+        status = models.MeetingStatus.COMPLETED
     else:
-        print(f"[BACKEND] Calling Gemini AI...")
-        try:
-            ai_output = generate_meeting_summary(transcript=transcript, file_path=file_path)
-            print(f"[BACKEND] AI output received: {ai_output}")
-        except Exception as e:
-            print(f"[BACKEND] ERROR in AI generation: {e}")
-            import traceback
-            traceback.print_exc()
-            ai_output = {
-                "summary": f"Error generating summary: {str(e)}",
-                "key_points": [],
-                "decisions": [],
-                "action_items": [],
-                "agenda": []
-            }
+        # Summary is generated after the response is sent; clients poll GET /meetings/{id}
+        ai_output = None
+        status = models.MeetingStatus.PROCESSING
 
     print(f"[BACKEND] Creating meeting record...")
     db_meeting = models.Meeting(
@@ -103,27 +160,119 @@ async def create_meeting(
         transcript=transcript,
         file_path=file_path,
         ai_output=ai_output,
+        status=status,
         timestamp=datetime.utcnow()
     )
     db.add(db_meeting)
-    db.commit()
-    db.refresh(db_meeting)
-    print(f"[BACKEND] Meeting created with ID: {db_meeting.id}")
-    print(f"[BACKEND] Meeting AI output: {db_meeting.ai_output}\n")
+    await db.commit()
+    await db.refresh(db_meeting)
+    print(f"[BACKEND] Meeting created with ID: {db_meeting.id} ({status.value})\n")
+
+    if status == models.MeetingStatus.PROCESSING:
+        background_tasks.add_task(summarize_meeting, db_meeting.id, transcript, file_path)
     return db_meeting
 
+async def summarize_meeting(meeting_id: int, transcript: Optional[str], file_path: Optional[str]):
+    from ai import generate_meeting_summary
+
+    print(f"[BACKEND] Calling Gemini AI for meeting {meeting_id}...")
+    try:
+        # Runs in a worker thread: file hashing/reads and the Gemini call are blocking
+        ai_output = await asyncio.to_thread(
+            generate_meeting_summary, transcript=transcript, file_path=file_path
+        )
+        status = models.MeetingStatus.COMPLETED
+        print(f"[BACKEND] AI output received: {ai_output}")
+    except Exception as e:
+        print(f"[BACKEND] ERROR in AI generation: {e}")
+        import traceback
+        traceback.print_exc()
+        ai_output = {
+            "summary": f"Error generating summary: {str(e)}",
+            "key_points": [],
+            "decisions": [],
+            "action_items": [],
+            "agenda": []
+        }
+        status = models.MeetingStatus.ERROR
+
+    async with database.SessionLocal() as db:
+        await db.execute(
+            update(models.Meeting)
+            .where(models.Meeting.id == meeting_id)
+            .values(ai_output=ai_output, status=status)
+        )
+        await db.commit()
+    print(f"[BACKEND] Meeting {meeting_id} {status.value}")
+
 @app.get("/meetings", response_model=List[schemas.Meeting])
-def read_meetings(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    meetings = db.query(models.Meeting).offset(skip).limit(limit).all()
-    return meetings
+async def read_meetings(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(models.Meeting).offset(skip).limit(limit))
+    return result.scalars().all()
+
+@app.post("/meetings/reprocess")
+async def reprocess_meetings(
+    background_tasks: BackgroundTasks,
+    meeting_ids: List[int] = Body(..., embed=True),
+    db: AsyncSession = Depends(get_db)
+):
+    """Re-summarize existing meetings in one Gemini batch job, run after the response is sent"""
+    result = await db.execute(select(models.Meeting).where(models.Meeting.id.in_(meeting_ids)))
+    meetings = result.scalars().all()
+    if not meetings:
+        raise HTTPException(status_code=404, detail="No matching meetings found")
+
+    items = {m.id: (m.transcript, m.file_path) for m in meetings}
+    await db.execute(
+        update(models.Meeting)
+        .where(models.Meeting.id.in_(items))
+        .values(status=models.MeetingStatus.PROCESSING)
+    )
+    await db.commit()
+    background_tasks.add_task(reprocess_meetings_batch, items)
+    print(f"[BACKEND] Queued {len(items)} meetings for batch reprocessing")
+    return {"queued": list(items)}
+
+async def reprocess_meetings_batch(items):
+    from ai import generate_meeting_summaries_batch
+
+    meeting_ids = list(items)
+    try:
+        outputs = await generate_meeting_summaries_batch(list(items.values()))
+    except Exception as e:
+        print(f"[BACKEND] ERROR in batch reprocessing: {e}")
+        outputs = [None] * len(meeting_ids)
+
+    # Failed meetings keep their previous ai_output and are only marked as errored
+    succeeded = [
+        {"meeting_id": meeting_id, "output": ai_output}
+        for meeting_id, ai_output in zip(meeting_ids, outputs) if ai_output is not None
+    ]
+    failed = [meeting_id for meeting_id, ai_output in zip(meeting_ids, outputs) if ai_output is None]
+
+    async with database.SessionLocal() as db:
+        # One executemany UPDATE instead of a SELECT + UPDATE per meeting; rows deleted
+        # while the batch ran simply match nothing
+        meetings_table = models.Meeting.__table__
+        if succeeded:
+            await db.execute(
+                update(meetings_table)
+                .where(meetings_table.c.id == bindparam("meeting_id"))
+                .values(ai_output=bindparam("output"), status=models.MeetingStatus.COMPLETED),
+                succeeded
+            )
+        if failed:
+            await db.execute(
+                update(meetings_table)
+                .where(meetings_table.c.id.in_(failed))
+                .values(status=models.MeetingStatus.ERROR)
+            )
+        await db.commit()
+        print(f"[BACKEND] Batch reprocessing finished | completed: {len(succeeded)} | failed: {failed}")
 
 @app.get("/test")
 def test_endpoint():
     """Test endpoint to verify backend is running"""
-    import os
-    from dotenv import load_dotenv
-    load_dotenv()
-    
     api_key = os.getenv("GEMINI_API_KEY")
     return {
         "status": "Backend is running",
@@ -132,22 +281,33 @@ def test_endpoint():
     }
 
 @app.get("/meetings/{meeting_id}", response_model=schemas.Meeting)
-def read_meeting(meeting_id: int, db: Session = Depends(get_db)):
-    db_meeting = db.query(models.Meeting).filter(models.Meeting.id == meeting_id).first()
+async def read_meeting(meeting_id: int, db: AsyncSession = Depends(get_db)):
+    db_meeting = await db.get(models.Meeting, meeting_id)
     if db_meeting is None:
         raise HTTPException(status_code=404, detail="Meeting not found")
     return db_meeting
 
 @app.delete("/meetings/{meeting_id}")
-def delete_meeting(meeting_id: int, db: Session = Depends(get_db)):
-    db_meeting = db.query(models.Meeting).filter(models.Meeting.id == meeting_id).first()
-    if db_meeting is None:
+async def delete_meeting(meeting_id: int, db: AsyncSession = Depends(get_db)):
+    # Single DELETE ... RETURNING instead of SELECT then DELETE
+    result = await db.execute(
+        delete(models.Meeting)
+        .where(models.Meeting.id == meeting_id)
+        .returning(models.Meeting.file_path)
+    )
+    deleted = result.first()
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Meeting not found")
-    
-    # Optional: Delete associated file
-    if db_meeting.file_path and os.path.exists(db_meeting.file_path):
-        os.remove(db_meeting.file_path)
+    await db.commit()
+
+    # Optional: Delete associated file (a missing file is fine, no separate exists check)
+    if deleted.file_path:
+        from ai import discard_transcode
+        # The transcode cache key needs the file's mtime, so drop it before the file itself
+        await asyncio.to_thread(discard_transcode, deleted.file_path)
+        try:
+            await asyncio.to_thread(os.remove, deleted.file_path)
+        except FileNotFoundError:
+            pass
 
-    db.delete(db_meeting)
-    db.commit()
     return {"ok": True}
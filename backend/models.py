@@ -26,14 +26,14 @@ class Meeting(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     type = Column(String)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     transcript = Column(Text, nullable=True)
     ai_output = Column(JSON, nullable=True)
     file_path = Column(String, nullable=True)
     
     # Bot-related fields
-    source = Column(String, default=MeetingSource.UPLOAD)
+    source = Column(String, default=MeetingSource.UPLOAD, nullable=False, index=True)
     meet_url = Column(String, nullable=True)
-    status = Column(String, default=MeetingStatus.PENDING)
+    status = Column(String, default=MeetingStatus.PENDING, nullable=False, index=True)
     bot_session_id = Column(String, nullable=True)
     scheduled_time = Column(DateTime, nullable=True)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, Any
+from typing import Optional, Any, List
 
 class MeetingBase(BaseModel):
     title: str
@@ -22,3 +22,16 @@ class Meeting(MeetingBase):
 
     class Config:
         from_attributes = True
+
+# Structured output schema for Gemini (passed as response_schema)
+class ActionItem(BaseModel):
+    task: str
+    owner: str
+    status: str = Field(description="Pending, In Progress or Done")
+
+class MeetingSummary(BaseModel):
+    summary: str = Field(description="2-3 sentence overview of the meeting")
+    key_points: List[str]
+    decisions: List[str]
+    action_items: List[ActionItem]
+    agenda: List[str]
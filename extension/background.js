@@ -4,6 +4,10 @@
 let isRecording = false;
 let recordingStartTime = null;
 
+// Give up waiting for a background summary after this long (e.g. if the server restarted)
+const SUMMARY_POLL_INTERVAL_MS = 2000;
+const SUMMARY_POLL_TIMEOUT_MS = 15 * 60 * 1000;
+
 // ─── Offscreen Document Management ─────────────────────────────────────────
 
 let creatingOffscreen = null;
@@ -187,8 +191,23 @@ async function handleAudioUpload(base64Audio, title) {
       throw new Error(`Upload failed (${uploadResponse.status}): ${errorText}`);
     }
 
-    const result = await uploadResponse.json();
+    let result = await uploadResponse.json();
     console.log('[Background] Upload successful:', result);
+
+    // The summary is generated in the background; poll until it is ready
+    const pollDeadline = Date.now() + SUMMARY_POLL_TIMEOUT_MS;
+    while (result.status === 'processing') {
+      if (Date.now() >= pollDeadline) {
+        throw new Error('Timed out waiting for the meeting summary');
+      }
+      await new Promise(resolve => setTimeout(resolve, SUMMARY_POLL_INTERVAL_MS));
+      const pollResponse = await fetch(`http://localhost:8000/meetings/${result.id}`);
+      if (!pollResponse.ok) {
+        throw new Error(`Failed to fetch meeting (${pollResponse.status})`);
+      }
+      result = await pollResponse.json();
+    }
+    console.log('[Background] Summary ready:', result.status);
     return result;
   } catch (error) {
     console.error('[Background] Upload error:', error);
@@ -15,12 +15,28 @@ const MeetingSummary = () => {
 
     useEffect(() => {
         console.log("[FRONTEND] MeetingSummary mounted, ID:", id);
+        let cancelled = false;
+        let pollTimer = null;
+        // Stop polling eventually in case the server died mid-summary
+        const pollDeadline = Date.now() + 15 * 60 * 1000;
         
         const fetchMeeting = async () => {
             console.log("[FRONTEND] Fetching meeting data...");
             try {
                 const meeting = await api.getMeeting(id);
                 console.log("[FRONTEND] Meeting data received:", meeting);
+                if (cancelled) return;
+
+                // Summary is generated in the background; poll until it is ready
+                if (meeting.status === 'processing') {
+                    if (Date.now() < pollDeadline) {
+                        pollTimer = setTimeout(fetchMeeting, 2000);
+                    } else {
+                        setError("Summary is taking longer than expected. Try again later.");
+                        setLoading(false);
+                    }
+                    return;
+                }
                 console.log("[FRONTEND] AI output:", meeting.ai_output);
 
                 // Transform backend data to frontend format if needed
@@ -36,10 +52,11 @@ const MeetingSummary = () => {
                 
                 console.log("[FRONTEND] Formatted data:", formattedData);
                 setData(formattedData);
+                setLoading(false);
             } catch (err) {
                 console.error("[FRONTEND] Failed to load meeting:", err);
+                if (cancelled) return;
                 setError("Failed to load meeting details.");
-            } finally {
                 setLoading(false);
             }
         };
@@ -47,6 +64,11 @@ const MeetingSummary = () => {
         if (id) {
             fetchMeeting();
         }
+
+        return () => {
+            cancelled = true;
+            clearTimeout(pollTimer);
+        };
     }, [id]);
 
     if (loading) return <div className="container">Loading...</div>;